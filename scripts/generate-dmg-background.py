@@ -7,11 +7,13 @@ Matches the app's pink-to-blue gradient aesthetic with arrow and instructions
 import os
 import sys
 import math
+import functools
 
 try:
+    import numpy as np
     from PIL import Image, ImageDraw, ImageFont, ImageFilter
 except ImportError:
-    print("Error: Pillow not installed. Run: source .venv/bin/activate")
+    print("Error: Pillow/NumPy not installed. Run: source .venv/bin/activate")
     sys.exit(1)
 
 # DMG window dimensions (2x for Retina)
@@ -34,29 +36,50 @@ def lerp_color(c1, c2, t):
     """Linear interpolation between two colors"""
     return tuple(int(c1[i] + (c2[i] - c1[i]) * t) for i in range(3))
 
-def create_gradient_background(draw, width, height):
+def lerp_colors(c1, c2, t):
+    """Vectorized lerp_color: one uint8 RGB row per value in the array t"""
+    c1 = np.array(c1, dtype=np.float64)
+    c2 = np.array(c2, dtype=np.float64)
+    return (c1 + (c2 - c1) * np.asarray(t)[:, None]).astype(np.uint8)
+
+def create_gradient_background(width, height):
     """Create a dark gradient background"""
-    for y in range(height):
-        t = y / height
-        base = lerp_color(DARKER_BG, DARK_BG, t * 0.5)
-        draw.line([(0, y), (width, y)], fill=base)
+    column = lerp_colors(DARKER_BG, DARK_BG, np.arange(height) / height * 0.5)
+    
+    # Broadcast the single column across every row. Building RGBA directly lets
+    # Pillow wrap the contiguous buffer without copying, which it cannot do for
+    # RGB, and saves the separate RGBA conversion
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[..., :3] = column[:, None, :]
+    rgba[..., 3] = 255
+    return Image.fromarray(rgba, 'RGBA')
 
 def draw_glow(img, center_x, center_y, radius, color, intensity=0.15):
-    """Draw a soft glow effect"""
-    glow = Image.new('RGBA', img.size, (0, 0, 0, 0))
-    glow_draw = ImageDraw.Draw(glow)
-    
-    for r in range(radius, 0, -3):
-        alpha = int(255 * intensity * (r / radius) ** 2)
-        glow_color = (*color, alpha)
-        glow_draw.ellipse([
-            center_x - r, center_y - r,
-            center_x + r, center_y + r
-        ], fill=glow_color)
-    
-    return Image.alpha_composite(img.convert('RGBA'), glow)
+    """Draw a soft glow effect onto an RGBA image"""
+    width, height = img.size
+    yy, xx = np.ogrid[:height, :width]
+    dist2 = (xx - center_x) ** 2 + (yy - center_y) ** 2
+    
+    # Alpha follows the (r / radius)^2 weight of the original ring stack,
+    # evaluated per pixel in one pass and clipped to the glow radius
+    alpha = 255 * intensity * dist2 / (radius * radius)
+    alpha[dist2 > (radius + 0.5) ** 2] = 0
+    
+    glow = np.empty((height, width, 4), dtype=np.uint8)
+    glow[..., :3] = color
+    glow[..., 3] = alpha.astype(np.uint8)
+    
+    return Image.alpha_composite(img, Image.fromarray(glow, 'RGBA'))
 
-def draw_curved_arrow(draw, start, end, color, thickness=6):
+def sample_bezier(x1, y1, mid_x, mid_y, x2, y2, steps):
+    """Sample a quadratic bezier as arrays, with one pink-to-blue color per segment"""
+    t = np.linspace(0, 1, steps + 1)
+    xs = (1-t)**2 * x1 + 2*(1-t)*t * mid_x + t**2 * x2
+    ys = (1-t)**2 * y1 + 2*(1-t)*t * mid_y + t**2 * y2
+    colors = lerp_colors(PINK, BLUE, np.arange(steps) / (steps + 1))
+    return xs, ys, colors
+
+def draw_curved_arrow(img, start, end, color, thickness=6):
     """Draw a beautiful curved arrow between two points"""
     x1, y1 = start
     x2, y2 = end
@@ -65,24 +88,11 @@ def draw_curved_arrow(draw, start, end, color, thickness=6):
     mid_x = (x1 + x2) / 2
     mid_y = min(y1, y2) - 80 * 2  # Arc above the icons
     
-    # Calculate bezier curve points
-    points = []
-    steps = 60
-    for i in range(steps + 1):
-        t = i / steps
-        # Quadratic bezier curve
-        x = (1-t)**2 * x1 + 2*(1-t)*t * mid_x + t**2 * x2
-        y = (1-t)**2 * y1 + 2*(1-t)*t * mid_y + t**2 * y2
-        points.append((x, y))
-    
-    # Draw the curve with anti-aliased lines
-    for i in range(len(points) - 1):
-        # Create gradient along the arrow (pink to blue)
-        t = i / len(points)
-        segment_color = lerp_color(PINK, BLUE, t)
-        draw.line([points[i], points[i + 1]], fill=(*segment_color, 255), width=thickness)
-    
-    # Draw arrowhead at the end
+    # Calculate bezier curve points and the gradient along the arrow
+    xs, ys, segment_colors = sample_bezier(x1, y1, mid_x, mid_y, x2, y2, steps=60)
+    points = list(zip(xs.tolist(), ys.tolist()))
+    
+    # Arrowhead at the end
     arrow_size = 25 * 2
     # Get direction at end point
     dx = points[-1][0] - points[-5][0]
@@ -104,8 +114,40 @@ def draw_curved_arrow(draw, start, end, color, thickness=6):
         (end_x - arrow_size * math.cos(angle + 0.5), 
          end_y - arrow_size * math.sin(angle + 0.5)),
     ]
-    draw.polygon(arrow_points, fill=(*BLUE, 255))
+    
+    # Render onto a transparent overlay covering just the arrow's bounding box
+    # (integer offsets keep the rasterization identical) and composite it in
+    all_x = [x for x, _ in points + arrow_points]
+    all_y = [y for _, y in points + arrow_points]
+    left = math.floor(min(all_x)) - thickness
+    top = math.floor(min(all_y)) - thickness
+    right = math.ceil(max(all_x)) + thickness
+    bottom = math.ceil(max(all_y)) + thickness
+    overlay = Image.new('RGBA', (right - left, bottom - top), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(overlay)
+    
+    def shift(point):
+        return (point[0] - left, point[1] - top)
+    
+    # Pillow has no per-vertex colored polyline, so segments are still drawn
+    # individually, but all coordinate and color math happens in sample_bezier
+    for i, segment_color in enumerate(segment_colors.tolist()):
+        draw.line([shift(points[i]), shift(points[i + 1])],
+                  fill=(*segment_color, 255), width=thickness)
+    draw.polygon([shift(point) for point in arrow_points], fill=(*BLUE, 255))
+    
+    img.alpha_composite(overlay, (left, top))
 
+def draw_text(img, xy, text, font, fill):
+    """Draw text on a tight transparent overlay and composite it onto img"""
+    left, top, right, bottom = ImageDraw.Draw(img).textbbox(xy, text, font=font)
+    left, top = math.floor(left), math.floor(top)
+    size = (math.ceil(right) - left, math.ceil(bottom) - top)
+    overlay = Image.new('RGBA', size, (0, 0, 0, 0))
+    ImageDraw.Draw(overlay).text((xy[0] - left, xy[1] - top), text, fill=fill, font=font)
+    img.alpha_composite(overlay, (left, top))
+
+@functools.lru_cache(maxsize=16)
 def get_font(size):
     """Get a nice font, with fallbacks"""
     font_paths = [
@@ -125,28 +167,25 @@ def main():
     project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
     scripts_dir = os.path.join(project_dir, "scripts")
     
-    # Create base image
-    img = Image.new('RGB', (WIDTH, HEIGHT), DARK_BG)
-    draw = ImageDraw.Draw(img)
-    
-    # Draw gradient background
-    create_gradient_background(draw, WIDTH, HEIGHT)
-    
-    # Convert to RGBA for transparency effects
-    img = img.convert('RGBA')
+    # The gradient and glows are smooth, so render them at 1x and upscale;
+    # only the arrow and text below need the full Retina resolution
+    img = create_gradient_background(WIDTH // 2, HEIGHT // 2)
     
     # Add subtle colored glows under icon positions
-    img = draw_glow(img, APP_X, APP_Y, 200 * 2, PINK, 0.12)
-    img = draw_glow(img, APPS_X, APPS_Y, 200 * 2, BLUE, 0.12)
+    img = draw_glow(img, APP_X // 2, APP_Y // 2, 200, PINK, 0.12)
+    img = draw_glow(img, APPS_X // 2, APPS_Y // 2, 200, BLUE, 0.12)
+    
+    img = img.resize((WIDTH, HEIGHT), Image.Resampling.BILINEAR)
     
-    # Get fresh draw object
+    # Draw object for measuring text; the arrow and text themselves are rendered
+    # on small overlays rather than across the full canvas
     draw = ImageDraw.Draw(img)
     
     # Draw curved arrow from app to Applications
     # Start from right side of app icon, end at left side of Applications
     arrow_start = (APP_X + 70 * 2, APP_Y - 50 * 2)
     arrow_end = (APPS_X - 70 * 2, APPS_Y - 50 * 2)
-    draw_curved_arrow(draw, arrow_start, arrow_end, PINK, thickness=8)
+    draw_curved_arrow(img, arrow_start, arrow_end, PINK, thickness=8)
     
     # Add instruction text
     font_large = get_font(32 * 2)
@@ -161,7 +200,7 @@ def main():
     
     # Draw text with gradient-like color (mix of pink and blue)
     text_color = lerp_color(PINK, BLUE, 0.4)
-    draw.text((text_x, text_y), text_main, fill=(*text_color, 255), font=font_large)
+    draw_text(img, (text_x, text_y), text_main, font_large, (*text_color, 255))
     
     # Subtitle
     text_sub = "Drop Gramfix onto the Applications folder"
@@ -170,17 +209,16 @@ def main():
     text_sub_x = (WIDTH - text_sub_width) / 2
     text_sub_y = text_y + 50 * 2
     
-    # Subtle gray for subtitle
-    draw.text((text_sub_x, text_sub_y), text_sub, fill=(150, 150, 160, 200), font=font_small)
+    # Subtle gray for subtitle, premixed with the background at ~80% opacity so
+    # the canvas stays opaque and can be saved with a plain RGB conversion
+    text_sub_color = lerp_color(DARK_BG, (150, 150, 160), 200 / 255)
+    draw_text(img, (text_sub_x, text_sub_y), text_sub, font_small, (*text_sub_color, 255))
     
     # Save the background
     output_path = os.path.join(scripts_dir, "dmg-background.png")
     
-    # Convert to RGB for saving (remove alpha for DMG compatibility)
-    final = Image.new('RGB', img.size, DARK_BG)
-    final.paste(img, (0, 0), img.split()[3] if img.mode == 'RGBA' else None)
-    
-    final.save(output_path, "PNG")
+    # Drop alpha for DMG compatibility
+    img.convert('RGB').save(output_path, "PNG")
     print(f"✓ DMG background created: {output_path}")
     print(f"  Size: {WIDTH}x{HEIGHT} (Retina-ready)")
 